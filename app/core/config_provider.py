@@ -1,6 +1,8 @@
 import os
+import threading
 
 from dotenv import load_dotenv
+from neo4j import GraphDatabase
 
 load_dotenv()
 
@@ -13,10 +15,30 @@ class ConfigProvider:
             "password": os.getenv("NEO4J_PASSWORD"),
         }
         self.github_key = os.getenv("GITHUB_PRIVATE_KEY")
+        self._neo4j_driver = None
+        self._neo4j_driver_lock = threading.Lock()
 
     def get_neo4j_config(self):
         return self.neo4j_config
 
+    def get_neo4j_driver(self):
+        """Return a Neo4j driver shared by the whole process.
+
+        The driver is thread safe and pools its own connections, so tools
+        built per request reuse it instead of opening a new pool each time.
+        """
+        if self._neo4j_driver is None:
+            with self._neo4j_driver_lock:
+                if self._neo4j_driver is None:
+                    self._neo4j_driver = GraphDatabase.driver(
+                        self.neo4j_config["uri"],
+                        auth=(
+                            self.neo4j_config["username"],
+                            self.neo4j_config["password"],
+                        ),
+                    )
+        return self._neo4j_driver
+
     def get_github_key(self):
         return self.github_key
 
@@ -0,0 +1,63 @@
+import re
+from typing import AsyncGenerator
+
+import aiofiles
+
+FINAL_ANSWER_SENTINEL = b"## Final Answer:"
+ANSI_RESET_SUFFIX = b"\x1b[00m\n"
+READ_CHUNK_SIZE = 4096
+
+# Matches the marker and the rest of its line; the newline group is missing
+# while the marker line is still incomplete in the buffer
+_FINAL_ANSWER_LINE_RE = re.compile(re.escape(FINAL_ANSWER_SENTINEL) + rb"[^\n]*(\n)?")
+
+SEEKING = 0
+STREAMING = 1
+
+
+def _decode_line(line: bytes) -> str:
+    if line.endswith(ANSI_RESET_SUFFIX):
+        line = line[: -len(ANSI_RESET_SUFFIX)]
+    return line.decode("utf-8", errors="replace")
+
+
+async def stream_final_answer(read_fd: int) -> AsyncGenerator[str, None]:
+    """Yield the lines a verbose Crew prints after its first final answer marker.
+
+    The pipe is read in fixed-size byte chunks. Until the marker is found,
+    each chunk is scanned once with a precompiled pattern covering the
+    marker and the end of its line, so the agent's log output before it is
+    never decoded or split into lines.
+    """
+    buffer = bytearray()
+    state = SEEKING
+    async with aiofiles.open(read_fd, mode="rb") as read_file:
+        while True:
+            chunk = await read_file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+
+            if state == SEEKING:
+                match = _FINAL_ANSWER_LINE_RE.search(buffer)
+                if match is None:
+                    # Keep just enough bytes to match a marker split across reads
+                    del buffer[: max(0, len(buffer) - len(FINAL_ANSWER_SENTINEL) + 1)]
+                    continue
+                if match.group(1) is None:
+                    del buffer[: match.start()]
+                    continue
+                # The marker line itself is not part of the answer
+                del buffer[: match.end()]
+                state = STREAMING
+
+            start = 0
+            line_end = buffer.find(b"\n", start)
+            while line_end != -1:
+                yield _decode_line(bytes(buffer[start : line_end + 1]))
+                start = line_end + 1
+                line_end = buffer.find(b"\n", start)
+            del buffer[:start]
+
+    if state == STREAMING and buffer:
+        yield _decode_line(bytes(buffer))
@@ -4,12 +4,12 @@ from contextlib import redirect_stdout
 from typing import Any, AsyncGenerator, Dict, List
 
 import agentops
-import aiofiles
 from crewai import Agent, Crew, Process, Task
 from pydantic import BaseModel, Field
 
 from app.modules.code_provider.code_provider_service import CodeProviderService
 from app.modules.conversations.message.message_schema import NodeContext
+from app.modules.intelligence.agents.agent_output_stream import stream_final_answer
 from app.modules.intelligence.provider.provider_service import (
     AgentType,
     ProviderService,
@@ -277,18 +277,8 @@ class DebugRAGAgent:
         asyncio.create_task(kickoff())
 
         # Stream the output
-        final_answer_streaming = False
-        async with aiofiles.open(read_fd, mode="r") as read_file:
-            async for line in read_file:
-                if not line:
-                    break
-                if final_answer_streaming:
-                    if line.endswith("\x1b[00m\n"):
-                        yield line[:-6]
-                    else:
-                        yield line
-                if "## Final Answer:" in line:
-                    final_answer_streaming = True
+        async for line in stream_final_answer(read_fd):
+            yield line
 
 
 async def kickoff_debug_rag_agent(
@@ -1,16 +1,26 @@
 import asyncio
+import logging
 import os
-from contextlib import redirect_stdout
+import threading
+from contextlib import aclosing
 from typing import AsyncGenerator, Dict, List
 
-import aiofiles
 from crewai import Agent, Crew, Process, Task
+from crewai.agents.parser import AgentFinish
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
+from app.core.database import SessionLocal
+from app.modules.intelligence.agents.parallel_tasks import (
+    run_in_worker,
+    run_parallel,
+)
+from app.modules.intelligence.memory.agent_response_cache import AgentResponseCache
+
 # Import necessary tools (assuming they're available in your project)
 from app.modules.intelligence.provider.provider_service import (
     AgentType,
-    ProviderService,
+    get_cached_llm,
 )
 from app.modules.intelligence.tools.code_query_tools.get_code_file_structure import (
     get_code_file_structure_tool,
@@ -30,12 +40,28 @@ from app.modules.intelligence.tools.kg_based_tools.get_code_from_probable_node_n
 from app.modules.intelligence.tools.kg_based_tools.get_nodes_from_tags_tool import (
     get_nodes_from_tags_tool,
 )
+from app.modules.intelligence.tools.tool_cache import (
+    disk_cached_tool,
+    log_tool_cache_stats,
+    ToolMemo,
+    log_tool_memo_stats,
+    memoized_tool,
+)
 from app.modules.intelligence.tools.web_tools.webpage_extractor_tool import (
     webpage_extractor_tool
 )
 from app.modules.intelligence.tools.web_tools.github_tool import github_tool
 
 
+MAX_ITER = int(os.getenv("MAX_ITER", "10"))
+_HAS_FIRECRAWL = bool(os.getenv("FIRECRAWL_API_KEY"))
+_HAS_GITHUB_APP = bool(os.getenv("GITHUB_APP_ID"))
+# Tags prefetched for the analysts' context, before any agent starts reasoning
+_PREFETCH_TAGS = ["API"]
+# Upper bound on each prefetched section, since it is resent on every iteration
+_MAX_PREFETCH_CHARS = 6000
+
+
 class DesignStep(BaseModel):
     step_number: int = Field(..., description="The order of the design step")
     description: str = Field(..., description="Description of the design step")
@@ -60,49 +86,129 @@ class LowLevelDesignPlan(BaseModel):
     )
 
 
+_CODEBASE_ANALYST_BACKSTORY = """You are an expert in analyzing complex codebases. Your task is to understand the
+            current project structure, identify key components, and provide insights that will help in
+            planning new feature implementations."""
+
+_IMPACT_ANALYST_BACKSTORY = """You are an expert in tracing how changes ripple through complex codebases. Your task
+            is to locate the files, functions and existing functionality that a new feature will touch or
+            can reuse, so that implementation planning starts from the right places."""
+
+_DESIGN_PLANNER_BACKSTORY = """You are a senior software architect specializing in creating detailed,
+            actionable design plans. Your expertise lies in breaking down complex features into
+            manageable steps and providing clear guidance for implementation."""
+
+
 class LowLevelDesignAgent:
     def __init__(self, sql_db, llm, user_id):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.max_iter = int(os.getenv("MAX_ITER", 10))
+        self.max_iter = MAX_ITER
         self.sql_db = sql_db
         self.llm = llm
         self.user_id = user_id
 
-        # Initialize tools
-        self.get_code_from_node_id = get_code_from_node_id_tool(sql_db, user_id)
-        self.get_code_from_probable_node_name = get_code_from_probable_node_name_tool(
-            sql_db, user_id
+        # Initialize tools, persisting knowledge graph lookups across runs and
+        # memoizing every call so all agents in the run share results
+        self._commit_ids = {}
+        self._memos: Dict[str, ToolMemo] = {}
+        self.get_code_from_node_id = self._memoized(
+            disk_cached_tool(
+                get_code_from_node_id_tool(sql_db, user_id), user_id, self._commit_ids
+            )
+        )
+        self.get_code_from_probable_node_name = self._memoized(
+            get_code_from_probable_node_name_tool(sql_db, user_id)
+        )
+        self.get_nodes_from_tags = self._memoized(
+            disk_cached_tool(
+                get_nodes_from_tags_tool(sql_db, user_id), user_id, self._commit_ids
+            )
+        )
+        self.ask_knowledge_graph_queries = self._memoized(
+            get_ask_knowledge_graph_queries_tool(sql_db, user_id)
         )
-        self.get_nodes_from_tags = get_nodes_from_tags_tool(sql_db, user_id)
-        self.ask_knowledge_graph_queries = get_ask_knowledge_graph_queries_tool(
-            sql_db, user_id
+        # Not disk cached: GithubService already caches the structure in Redis
+        self.get_code_file_structure = self._memoized(
+            get_code_file_structure_tool(sql_db)
         )
-        self.get_code_file_structure = get_code_file_structure_tool(sql_db)
-        self.get_node_neighbours_from_node_id = get_node_neighbours_from_node_id_tool(
-            sql_db
+        self.get_node_neighbours_from_node_id = self._memoized(
+            disk_cached_tool(
+                get_node_neighbours_from_node_id_tool(sql_db),
+                user_id,
+                self._commit_ids,
+            )
         )
-        if os.getenv("FIRECRAWL_API_KEY"):
+        if _HAS_FIRECRAWL:
             self.webpage_extractor_tool = webpage_extractor_tool(sql_db, user_id)
-        if os.getenv("GITHUB_APP_ID"):
+        if _HAS_GITHUB_APP:
             self.github_tool = github_tool(sql_db, user_id)
 
-    async def create_agents(self):
+        self._extra_tools = tuple(
+            tool
+            for tool in (
+                getattr(self, "webpage_extractor_tool", None),
+                getattr(self, "github_tool", None),
+            )
+            if tool is not None
+        )
+        self._planner_tools = (
+            self.get_nodes_from_tags,
+            self.ask_knowledge_graph_queries,
+            self.get_code_from_node_id,
+            self.get_code_from_probable_node_name,
+            self.get_code_file_structure,
+            self.get_node_neighbours_from_node_id,
+        )
+
+    def _memoized(self, tool: StructuredTool) -> StructuredTool:
+        # Wrappers bound to different sessions still share one memo per tool
+        return memoized_tool(tool, memo=self._memos.setdefault(tool.name, ToolMemo()))
+
+    def _create_analyst_tools(self, sql_db) -> List[StructuredTool]:
+        # The analysts run in concurrent threads and a Session is not
+        # thread-safe, so each one gets tools bound to a session of its own
+        return [
+            self._memoized(
+                disk_cached_tool(
+                    get_nodes_from_tags_tool(sql_db, self.user_id),
+                    self.user_id,
+                    self._commit_ids,
+                )
+            ),
+            self._memoized(get_ask_knowledge_graph_queries_tool(sql_db, self.user_id)),
+            self._memoized(
+                disk_cached_tool(
+                    get_code_from_node_id_tool(sql_db, self.user_id),
+                    self.user_id,
+                    self._commit_ids,
+                )
+            ),
+            self._memoized(get_code_from_probable_node_name_tool(sql_db, self.user_id)),
+            self._memoized(get_code_file_structure_tool(sql_db)),
+            *self._extra_tools,
+        ]
+
+    async def create_agents(self, structural_db, impact_db):
+        # The structural and impact analyses run concurrently, so each needs its
+        # own Agent instance (CrewAI keeps a single executor per agent).
         codebase_analyst = Agent(
             role="Codebase Analyst",
             goal="Analyze the existing codebase and provide insights on the current structure and patterns",
-            backstory="""You are an expert in analyzing complex codebases. Your task is to understand the
-            current project structure, identify key components, and provide insights that will help in
-            planning new feature implementations.""",
-            tools=[
-                self.get_nodes_from_tags,
-                self.ask_knowledge_graph_queries,
-                self.get_code_from_node_id,
-                self.get_code_from_probable_node_name,
-                self.get_code_file_structure,
-            ] + ([self.webpage_extractor_tool] if hasattr(self, 'webpage_extractor_tool') else [])
-              + ([self.github_tool] if hasattr(self, 'github_tool') else []),
+            backstory=_CODEBASE_ANALYST_BACKSTORY,
+            tools=self._create_analyst_tools(structural_db),
+            allow_delegation=False,
+            verbose=False,
+            llm=self.llm,
+            max_iter=self.max_iter,
+        )
+
+        impact_analyst = Agent(
+            role="Impact Analyst",
+            goal="Identify the files and components of the codebase that a new feature will affect",
+            backstory=_IMPACT_ANALYST_BACKSTORY,
+            tools=self._create_analyst_tools(impact_db),
             allow_delegation=False,
-            verbose=True,
+            verbose=False,
             llm=self.llm,
             max_iter=self.max_iter,
         )
@@ -110,49 +216,60 @@ class LowLevelDesignAgent:
         design_planner = Agent(
             role="Design Planner",
             goal="Create a detailed low-level design plan for implementing new features",
-            backstory="""You are a senior software architect specializing in creating detailed,
-            actionable design plans. Your expertise lies in breaking down complex features into
-            manageable steps and providing clear guidance for implementation.""",
-            tools=[
-                self.get_nodes_from_tags,
-                self.ask_knowledge_graph_queries,
-                self.get_code_from_node_id,
-                self.get_code_from_probable_node_name,
-                self.get_code_file_structure,
-                self.get_node_neighbours_from_node_id,
-            ],
+            backstory=_DESIGN_PLANNER_BACKSTORY,
+            tools=list(self._planner_tools),
             allow_delegation=True,
-            verbose=True,
+            verbose=False,
             llm=self.llm,
         )
 
-        return codebase_analyst, design_planner
+        return codebase_analyst, impact_analyst, design_planner
 
     async def create_tasks(
         self,
         functional_requirements: str,
         project_id: str,
         codebase_analyst,
+        impact_analyst,
         design_planner,
+        project_context: str,
     ):
-        analyze_codebase_task = Task(
+        # structural_task and impact_task do not depend on each other, so they
+        # are run concurrently by run() and design_task waits on both.
+        structural_task = Task(
             description=f"""
             Analyze the existing codebase for repo id {project_id} to understand its structure and patterns.
             Focus on the following:
             1. Identify the main components and their relationships.
             2. Determine the current architecture and design patterns in use.
-            3. Locate areas that might be affected by the new feature described in: {functional_requirements}
-            4. Identify any existing similar features or functionality that could be leveraged.
 
             Use the provided tools to query the knowledge graph and retrieve relevant code snippets as needed.
-            You can use the probable node name tool to get the code for a node by providing a partial file or function name.
-            Provide a comprehensive analysis that will aid in creating a low-level design plan.
+            Provide a concise structural summary that will aid in creating a low-level design plan.
+
+            {project_context}
             """,
             agent=codebase_analyst,
-            expected_output="Codebase analysis report with insights on project structure and patterns",
+            expected_output="Structural summary of the project's components, architecture and patterns",
         )
 
-        create_design_plan_task = Task(
+        impact_task = Task(
+            description=f"""
+            Analyze the existing codebase for repo id {project_id} to find what the new feature described in: {functional_requirements}
+            will affect. Focus on the following:
+            1. Locate the files, classes and functions that might be affected by the new feature.
+            2. Identify any existing similar features or functionality that could be leveraged.
+
+            Use the provided tools to query the knowledge graph and retrieve relevant code snippets as needed.
+            You can use the probable node name tool to get the code for a node by providing a partial file or function name.
+            Provide the list of relevant files with a short note on why each one matters.
+
+            {project_context}
+            """,
+            agent=impact_analyst,
+            expected_output="List of relevant files and reusable functionality for the new feature",
+        )
+
+        design_task = Task(
             description=f"""
 
             Based on the codebase analysis of repo id {project_id} and the following functional requirements: {functional_requirements}
@@ -170,48 +287,157 @@ class LowLevelDesignAgent:
             Ensure your output follows the structure defined in the LowLevelDesignPlan Pydantic model.
             """,
             agent=design_planner,
-            context=[analyze_codebase_task],
+            context=[structural_task, impact_task],
             expected_output="Low-level design plan for implementing the new feature",
         )
 
-        return [analyze_codebase_task, create_design_plan_task]
+        return [structural_task, impact_task, design_task]
+
+    @staticmethod
+    def _truncate(text: str) -> str:
+        if len(text) <= _MAX_PREFETCH_CHARS:
+            return text
+        return text[:_MAX_PREFETCH_CHARS] + "\n... (truncated, use the tools for more)"
+
+    def _fetch_tagged_nodes(self, project_id: str):
+        # Runs in a worker thread, with a session opened and closed in that thread
+        with SessionLocal() as tags_db:
+            tool = self._memoized(
+                disk_cached_tool(
+                    get_nodes_from_tags_tool(tags_db, self.user_id),
+                    self.user_id,
+                    self._commit_ids,
+                )
+            )
+            return tool.func(tags=_PREFETCH_TAGS, project_id=project_id)
+
+    async def prefetch_project_context(self, project_id: str) -> str:
+        # Both lookups are independent, so fetch them together up front rather
+        # than leaving the analysts to spend reasoning turns issuing them serially
+        file_structure, tagged_nodes = await asyncio.gather(
+            self.get_code_file_structure.coroutine(project_id=project_id),
+            run_in_worker(self._fetch_tagged_nodes, project_id),
+            return_exceptions=True,
+        )
+        context = []
+        if isinstance(file_structure, BaseException):
+            logging.warning(f"Error prefetching file structure: {str(file_structure)}")
+        else:
+            context.append(
+                "File structure of the repository:\n" + self._truncate(file_structure)
+            )
+        if isinstance(tagged_nodes, BaseException):
+            logging.warning(f"Error prefetching tagged nodes: {str(tagged_nodes)}")
+        elif tagged_nodes:
+            # Only list where the nodes are, their code is available through the tools
+            node_lines = "\n".join(
+                f"- {node['file_path']}: {node['name']} (node_id: {node['node_id']})"
+                for node in tagged_nodes
+            )
+            tags = ", ".join(_PREFETCH_TAGS)
+            context.append(f"Nodes tagged {tags}:\n" + self._truncate(node_lines))
+        return "\n\n".join(context)
 
     async def run(
         self, functional_requirements: str, project_id: str
     ) -> AsyncGenerator[str, None]:
-        codebase_analyst, design_planner = await self.create_agents()
-        tasks = await self.create_tasks(
-            functional_requirements, project_id, codebase_analyst, design_planner
+        # Closed once the run is over and its worker threads have returned, see
+        # _create_analyst_tools
+        with SessionLocal() as structural_db, SessionLocal() as impact_db:
+            async with aclosing(
+                self._run(functional_requirements, project_id, structural_db, impact_db)
+            ) as stream:
+                async for chunk in stream:
+                    yield chunk
+
+    async def _run(
+        self, functional_requirements: str, project_id: str, structural_db, impact_db
+    ) -> AsyncGenerator[str, None]:
+        codebase_analyst, impact_analyst, design_planner = await self.create_agents(
+            structural_db, impact_db
         )
+        project_context = await self.prefetch_project_context(project_id)
+        structural_task, impact_task, design_task = await self.create_tasks(
+            functional_requirements,
+            project_id,
+            codebase_analyst,
+            impact_analyst,
+            design_planner,
+            project_context,
+        )
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        # Set when the consumer stops iterating, e.g. on client disconnect
+        cancelled = threading.Event()
+
+        def step_callback(step):
+            # Called from CrewAI worker threads; only final answers are streamed
+            if cancelled.is_set():
+                # Cancelling kickoff_task does not stop the worker threads, so stop
+                # the agent at its next step. CancelledError is not an Exception,
+                # so CrewAI does not retry the task.
+                raise asyncio.CancelledError()
+            if isinstance(step, AgentFinish):
+                loop.call_soon_threadsafe(queue.put_nowait, f"{step.output}\n")
 
-        read_fd, write_fd = os.pipe()
+        # Set once the planner's final answer has been streamed
+        plan_streamed = threading.Event()
+
+        def planner_step_callback(step):
+            step_callback(step)
+            if isinstance(step, AgentFinish):
+                plan_streamed.set()
+
+        # The analysts run outside the crew, so they need the callback set directly
+        codebase_analyst.step_callback = step_callback
+        impact_analyst.step_callback = step_callback
+        design_planner.step_callback = planner_step_callback
+
+        # Only the planner goes through the crew, which gives it the delegation
+        # tools; it reads the analysis outputs through design_task's context
+        crew = Crew(
+            agents=[codebase_analyst, impact_analyst, design_planner],
+            tasks=[design_task],
+            process=Process.sequential,
+            verbose=False,
+        )
 
         async def kickoff():
-            with os.fdopen(write_fd, "w", buffering=1) as write_file:
-                with redirect_stdout(write_file):
-                    crew = Crew(
-                        agents=[codebase_analyst, design_planner],
-                        tasks=tasks,
-                        process=Process.sequential,
-                        verbose=True,
-                    )
-                    await crew.kickoff_async()
-
-        asyncio.create_task(kickoff())
-
-        # Stream the output
-        final_answer_streaming = False
-        async with aiofiles.open(read_fd, mode="r") as read_file:
-            async for line in read_file:
-                if not line:
+            try:
+                results = await run_parallel([structural_task, impact_task])
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                crew_output = await run_in_worker(crew.kickoff)
+                # A forced final answer (e.g. on hitting max_iter) is returned
+                # without going through step_callback, so stream it from the output
+                if not plan_streamed.is_set():
+                    queue.put_nowait(f"{crew_output.raw}\n")
+            finally:
+                queue.put_nowait(None)
+
+        kickoff_task = asyncio.create_task(kickoff())
+
+        try:
+            # Stream the output
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
                     break
-                if final_answer_streaming:
-                    if line.endswith("\x1b[00m\n"):
-                        yield line[:-6]
-                    else:
-                        yield line
-                if "## Final Answer:" in line:
-                    final_answer_streaming = True
+                yield chunk
+            # Surface any error raised by the crew
+            await kickoff_task
+        finally:
+            if not kickoff_task.done():
+                cancelled.set()
+                kickoff_task.cancel()
+                # Returns once the worker threads have stopped, so the analysts'
+                # sessions are not closed while a tool call is still using them
+                await asyncio.gather(kickoff_task, return_exceptions=True)
+        log_tool_cache_stats()
+        log_tool_memo_stats(self._memos)
 
 
 async def create_low_level_design_agent(
@@ -221,8 +447,26 @@ async def create_low_level_design_agent(
     llm,
     user_id: str,
 ) -> AsyncGenerator[str, None]:
-    provider_service = ProviderService(sql_db, user_id)
-    crew_ai_llm = provider_service.get_large_llm(agent_type=AgentType.CREWAI)
+    response_cache = AgentResponseCache(sql_db, "low_level_design")
+    cached_plan, similar_match = await response_cache.get(
+        user_id, project_id, functional_requirements
+    )
+    if cached_plan:
+        if similar_match:
+            yield "_Showing a cached design plan for a closely matching request._\n\n"
+        yield cached_plan
+        return
+
+    crew_ai_llm = get_cached_llm(sql_db, user_id, AgentType.CREWAI)
     design_agent = LowLevelDesignAgent(sql_db, crew_ai_llm, user_id)
-    async for chunk in design_agent.run(functional_requirements, project_id):
-        yield chunk
+    chunks = []
+    # Close run() as soon as this generator is closed so the crew is cancelled
+    async with aclosing(
+        design_agent.run(functional_requirements, project_id)
+    ) as stream:
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+    await response_cache.set(
+        user_id, project_id, functional_requirements, "".join(chunks)
+    )
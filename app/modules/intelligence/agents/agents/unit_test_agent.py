@@ -1,13 +1,17 @@
+import asyncio
 import os
+from string import Template
 from typing import Dict, List
 
-from crewai import Agent, Crew, Process, Task
+import orjson
+from crewai import Agent, Task
+from langchain_core.messages import BaseMessage
 from pydantic import BaseModel, Field
 
 from app.modules.conversations.message.message_schema import NodeContext
 from app.modules.intelligence.provider.provider_service import (
     AgentType,
-    ProviderService,
+    get_cached_llm,
 )
 from app.modules.intelligence.tools.kg_based_tools.get_code_from_node_id_tool import (
     get_code_from_node_id_tool,
@@ -15,76 +19,33 @@ from app.modules.intelligence.tools.kg_based_tools.get_code_from_node_id_tool im
 from app.modules.intelligence.tools.kg_based_tools.get_code_from_probable_node_name_tool import (
     get_code_from_probable_node_name_tool,
 )
+from app.modules.intelligence.tools.tool_cache import (
+    disk_cached_tool,
+    log_tool_cache_stats,
+)
 from app.modules.intelligence.tools.web_tools.webpage_extractor_tool import (
     webpage_extractor_tool
 )
 from app.modules.intelligence.tools.web_tools.github_tool import github_tool
 
 
-class UnitTestAgent:
-    def __init__(self, sql_db, llm, user_id):
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.max_iterations = os.getenv("MAX_ITER", 15)
-        self.sql_db = sql_db
-        self.llm = llm
-        self.user_id = user_id
-        # Initialize tools with both sql_db and user_id
-        self.get_code_from_node_id = get_code_from_node_id_tool(sql_db, user_id)
-        self.get_code_from_probable_node_name = get_code_from_probable_node_name_tool(
-            sql_db, user_id
-        )
-        if os.getenv("FIRECRAWL_API_KEY"):
-            self.webpage_extractor_tool = webpage_extractor_tool(sql_db, user_id)
-        if os.getenv("GITHUB_APP_ID"):
-            self.github_tool = github_tool(sql_db, user_id)
+MAX_ITER = int(os.getenv("MAX_ITER", "15"))
+_HAS_FIRECRAWL = bool(os.getenv("FIRECRAWL_API_KEY"))
+_HAS_GITHUB_APP = bool(os.getenv("GITHUB_APP_ID"))
 
-    async def create_agents(self):
-        unit_test_agent = Agent(
-            role="Test Plan and Unit Test Expert",
-            goal="Create test plans and write unit tests based on user requirements",
-            backstory="You are a seasoned AI test engineer specializing in creating robust test plans and unit tests. You aim to assist users effectively in generating and refining test plans and unit tests, ensuring they are comprehensive and tailored to the user's project requirements.",
-            tools=[
-                self.get_code_from_node_id,
-                self.get_code_from_probable_node_name,
-            ] + ([self.webpage_extractor_tool] if hasattr(self, 'webpage_extractor_tool') else [])
-              + ([self.github_tool] if hasattr(self, 'github_tool') else []),
-            allow_delegation=False,
-            verbose=True,
-            llm=self.llm,
-            max_iter=self.max_iterations,
-        )
 
-        return unit_test_agent
+_UNIT_TEST_BACKSTORY = "You are a seasoned AI test engineer specializing in creating robust test plans and unit tests. You aim to assist users effectively in generating and refining test plans and unit tests, ensuring they are comprehensive and tailored to the user's project requirements."
 
-    class TestAgentResponse(BaseModel):
-        response: str = Field(
-            ...,
-            description="String response containing the Markdown formatted test plan and the test suite code block",
-        )
-        citations: List[str] = Field(
-            ..., description="Exhaustive List of file names referenced in the response"
-        )
-
-    async def create_tasks(
-        self,
-        node_ids: List[NodeContext],
-        project_id: str,
-        query: str,
-        history: List,
-        unit_test_agent,
-    ):
-        node_ids_list = [node.node_id for node in node_ids]
-
-        unit_test_task = Task(
-            description=f"""Your mission is to create comprehensive test plans and corresponding unit tests based on the user's query and provided code.
+_UNIT_TEST_PROMPT_TMPL = Template(
+    """Your mission is to create comprehensive test plans and corresponding unit tests based on the user's query and provided code.
             Given the following context:
-            - Chat History: {history}
+            - Chat History: $history
 
             Process:
             1. **Code Retrieval:**
             - If not already present in the history, Fetch the docstrings and code for the provided node IDs using the get_code_from_node_id tool.
-            - Node IDs: {', '.join(node_ids_list)}
-            - Project ID: {project_id}
+            - Node IDs: $node_ids
+            - Project ID: $project_id
             - Fetch the code for the file path of the function/class mentioned in the user's query using the get code from probable node name tool. This is needed for correct inport of class name in the unit test file.
 
             2. **Analysis:**
@@ -113,7 +74,7 @@ class UnitTestAgent:
             6. **Reflection and Iteration:**
             - Review the test plans and unit tests.
             - Ensure comprehensive coverage and correctness.
-            - Make refinements as necessary, respecting the max iterations limit of {self.max_iterations}.
+            - Make refinements as necessary, respecting the max iterations limit of $max_iterations.
 
             7. **Response Construction:**
             - Provide the test plans and unit tests in your response.
@@ -121,18 +82,102 @@ class UnitTestAgent:
             - Ensure the response is clear and well-organized.
 
             Constraints:
-            - Refer to the user's query: "{query}"
+            - Refer to the user's query: "$query"
             - Consider the chat history for any specific instructions or context.
-            - Respect the max iterations limit of {self.max_iterations} when planning and executing tools.
+            - Respect the max iterations limit of $max_iterations when planning and executing tools.
 
-            Ensure that your final response is JSON serializable and follows the specified pydantic model: {self.TestAgentResponse.model_json_schema()}
+            Ensure that your final response is JSON serializable and follows the specified pydantic model: $response_schema
             Don't wrap it in ```json or ```python or ```code or ```
             For citations, include only the file_path of the nodes fetched and used.
-            """,
+"""
+)
+
+
+def _format_history_message(message) -> str:
+    # Keep who said what; str() on a LangChain message drops its type
+    if isinstance(message, BaseMessage):
+        return f"{message.type}: {message.content}"
+    return str(message)
+
+
+class UnitTestAgent:
+    def __init__(self, sql_db, llm, user_id):
+        self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        self.max_iterations = MAX_ITER
+        self.sql_db = sql_db
+        self.llm = llm
+        self.user_id = user_id
+        # Initialize tools with both sql_db and user_id
+        self.get_code_from_node_id = disk_cached_tool(
+            get_code_from_node_id_tool(sql_db, user_id), user_id
+        )
+        self.get_code_from_probable_node_name = get_code_from_probable_node_name_tool(
+            sql_db, user_id
+        )
+        if _HAS_FIRECRAWL:
+            self.webpage_extractor_tool = webpage_extractor_tool(sql_db, user_id)
+        if _HAS_GITHUB_APP:
+            self.github_tool = github_tool(sql_db, user_id)
+
+        self._extra_tools = tuple(
+            tool
+            for tool in (
+                getattr(self, "webpage_extractor_tool", None),
+                getattr(self, "github_tool", None),
+            )
+            if tool is not None
+        )
+        self._tools = (
+            self.get_code_from_node_id,
+            self.get_code_from_probable_node_name,
+        ) + self._extra_tools
+
+    async def create_agents(self):
+        unit_test_agent = Agent(
+            role="Test Plan and Unit Test Expert",
+            goal="Create test plans and write unit tests based on user requirements",
+            backstory=_UNIT_TEST_BACKSTORY,
+            tools=list(self._tools),
+            allow_delegation=False,
+            verbose=False,
+            llm=self.llm,
+            max_iter=self.max_iterations,
+        )
+
+        return unit_test_agent
+
+    class TestAgentResponse(BaseModel):
+        response: str = Field(
+            ...,
+            description="String response containing the Markdown formatted test plan and the test suite code block",
+        )
+        citations: List[str] = Field(
+            ..., description="Exhaustive List of file names referenced in the response"
+        )
+
+    # Serialized once at class creation rather than walking the pydantic schema per request
+    _SCHEMA_JSON = orjson.dumps(TestAgentResponse.model_json_schema()).decode()
+
+    async def create_tasks(
+        self,
+        node_ids: List[NodeContext],
+        project_id: str,
+        query: str,
+        history: List,
+        unit_test_agent,
+    ):
+        unit_test_task = Task(
+            description=_UNIT_TEST_PROMPT_TMPL.substitute(
+                history="\n".join(map(_format_history_message, history)),
+                node_ids=", ".join(node.node_id for node in node_ids),
+                project_id=project_id,
+                max_iterations=self.max_iterations,
+                query=query,
+                response_schema=self._SCHEMA_JSON,
+            ),
             expected_output="Outline the test plan and write unit tests for each node based on the test plan.",
             agent=unit_test_agent,
             output_pydantic=self.TestAgentResponse,
-            async_execution=True,
         )
 
         return unit_test_task
@@ -149,14 +194,14 @@ class UnitTestAgent:
             node_ids, project_id, query, chat_history, unit_test_agent
         )
 
-        crew = Crew(
-            agents=[unit_test_agent],
-            tasks=[unit_test_task],
-            process=Process.sequential,
-            verbose=True,
+        # A single agent running a single task gains nothing from Crew's
+        # orchestration loop, so execute the task directly off the event loop
+        result = await asyncio.to_thread(
+            unit_test_task.execute_sync,
+            agent=unit_test_agent,
+            tools=unit_test_agent.tools,
         )
-
-        result = await crew.kickoff_async()
+        log_tool_cache_stats()
 
         return result
 
@@ -174,8 +219,7 @@ async def kickoff_unit_test_agent(
         return {
             "error": "No function name is provided by the user. The agent cannot generate test plan or test code without specific class or function being selected by the user. Request the user to use the '@ followed by file or function name' feature to link individual functions to the message. "
         }
-    provider_service = ProviderService(sql_db, user_id)
-    crew_ai_llm = provider_service.get_large_llm(agent_type=AgentType.CREWAI)
+    crew_ai_llm = get_cached_llm(sql_db, user_id, AgentType.CREWAI)
     unit_test_agent = UnitTestAgent(sql_db, crew_ai_llm, user_id)
     result = await unit_test_agent.run(project_id, node_ids, query, chat_history)
     return result
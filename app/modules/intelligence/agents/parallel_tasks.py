@@ -0,0 +1,52 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Union
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+MAX_PARALLEL_TASKS = int(os.getenv("MAX_PARALLEL_TASKS", "4"))
+
+# Shared by every request in the process, so the cap applies to the total load
+# on the LLM provider rather than to each run. A threading semaphore is used
+# because it is acquired in the worker threads and is not tied to a loop.
+_task_slots = threading.BoundedSemaphore(MAX_PARALLEL_TASKS)
+
+_executor = ThreadPoolExecutor(thread_name_prefix="crew-worker")
+
+
+async def run_in_worker(func: Callable[..., Any], *args) -> Any:
+    """Run func in a worker thread and, if cancelled, wait for it to return.
+
+    A running thread cannot be interrupted, so returning straight away on
+    cancellation would let the caller release resources, such as DB
+    sessions, that the thread is still using.
+    """
+    future = _executor.submit(func, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        if not future.done():
+            await asyncio.to_thread(wait, [future])
+
+
+def _execute_task(task: Task) -> TaskOutput:
+    with _task_slots:
+        return task.execute_sync(agent=task.agent, tools=task.agent.tools)
+
+
+async def run_parallel(tasks: List[Task]) -> List[Union[TaskOutput, BaseException]]:
+    """Execute independent CrewAI tasks concurrently with their assigned agents.
+
+    Each task runs Task.execute_sync in a worker thread, and at most
+    MAX_PARALLEL_TASKS tasks execute at once across the process to stay
+    within provider rate limits. Errors are returned in place of the output,
+    like asyncio.gather(return_exceptions=True). Task.execute_async is not
+    used because its future never resolves when the task raises.
+    """
+    return await asyncio.gather(
+        *(run_in_worker(_execute_task, task) for task in tasks),
+        return_exceptions=True,
+    )
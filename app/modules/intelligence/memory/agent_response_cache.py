@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from redis import Redis
+from sentence_transformers import SentenceTransformer
+from sqlalchemy.orm import Session
+
+from app.core.config_provider import config_provider
+from app.modules.projects.projects_schema import ProjectStatusEnum
+from app.modules.projects.projects_service import ProjectService
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+SIMILARITY_THRESHOLD = 0.93
+# Number of recent requests per project snapshot considered for near matches
+MAX_INDEX_ENTRIES = 50
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_model() -> SentenceTransformer:
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+class AgentResponseCache:
+    """Redis-backed cache of full agent responses for a project snapshot.
+
+    Responses are keyed on the user, project, parsed commit and normalized
+    request text. When there is no exact match, the request embedding is
+    compared against recent requests for the same snapshot and a close
+    enough match is returned instead.
+    """
+
+    def __init__(self, db: Session, namespace: str):
+        self.db = db
+        self.namespace = namespace
+        self.redis = Redis.from_url(config_provider.get_redis_url())
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip().lower()
+
+    def _snapshot(self, project_id: str) -> Optional[str]:
+        project = ProjectService(self.db).get_project_from_db_by_id_sync(project_id)
+        if not project or project["status"] != ProjectStatusEnum.READY.value:
+            return None
+        return project["commit_id"]
+
+    def _entry_key(self, user_id: str, project_id: str, commit_id: str, text: str):
+        digest = hashlib.sha256(
+            f"{user_id}:{project_id}:{commit_id}:{self._normalize(text)}".encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        return f"{self.namespace}:response:{digest}"
+
+    def _index_key(self, user_id: str, project_id: str, commit_id: str) -> str:
+        return f"{self.namespace}:index:{user_id}:{project_id}:{commit_id}"
+
+    async def _embed(self, text: str) -> np.ndarray:
+        embedding = await asyncio.to_thread(
+            _get_embedding_model().encode, self._normalize(text)
+        )
+        return embedding / np.linalg.norm(embedding)
+
+    async def get(
+        self, user_id: str, project_id: str, text: str
+    ) -> Tuple[Optional[str], bool]:
+        """Return the cached response and whether it came from a near match."""
+        try:
+            commit_id = self._snapshot(project_id)
+            if not commit_id:
+                return None, False
+
+            cached = self.redis.get(
+                self._entry_key(user_id, project_id, commit_id, text)
+            )
+            if cached:
+                logger.info(f"{self.namespace} cache hit for project {project_id}")
+                return cached.decode("utf-8"), False
+
+            entries = self.redis.lrange(
+                self._index_key(user_id, project_id, commit_id), 0, -1
+            )
+            if not entries:
+                return None, False
+
+            entries = [json.loads(entry) for entry in entries]
+            similarities = np.array(
+                [entry["embedding"] for entry in entries]
+            ) @ await self._embed(text)
+            best = int(np.argmax(similarities))
+            if similarities[best] < SIMILARITY_THRESHOLD:
+                return None, False
+
+            cached = self.redis.get(entries[best]["key"])
+            if not cached:
+                return None, False
+            logger.info(
+                f"{self.namespace} similar-match cache hit for project {project_id} "
+                f"(similarity {similarities[best]:.3f})"
+            )
+            return cached.decode("utf-8"), True
+        except Exception as e:
+            logger.warning(f"Error reading {self.namespace} response cache: {str(e)}")
+            return None, False
+
+    async def set(self, user_id: str, project_id: str, text: str, response: str):
+        try:
+            commit_id = self._snapshot(project_id)
+            if not commit_id or not response:
+                return
+
+            entry_key = self._entry_key(user_id, project_id, commit_id, text)
+            self.redis.setex(entry_key, RESPONSE_CACHE_TTL, response)
+
+            index_key = self._index_key(user_id, project_id, commit_id)
+            embedding = await self._embed(text)
+            pipeline = self.redis.pipeline()
+            pipeline.lpush(
+                index_key,
+                json.dumps({"key": entry_key, "embedding": embedding.tolist()}),
+            )
+            pipeline.ltrim(index_key, 0, MAX_INDEX_ENTRIES - 1)
+            pipeline.expire(index_key, RESPONSE_CACHE_TTL)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Error writing {self.namespace} response cache: {str(e)}")
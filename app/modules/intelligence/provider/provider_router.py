@@ -1,5 +1,7 @@
+import threading
 from typing import List
 
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 
@@ -11,6 +13,22 @@ from .provider_schema import GetProviderResponse, ProviderInfo, SetProviderReque
 
 router = APIRouter()
 
+# Recently verified (user_id, signature) pairs; only successful checks are kept
+_verified_signatures: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_verified_signatures_lock = threading.Lock()
+
+
+def _verify_hmac_signature(user_id: str, hmac_signature: str) -> bool:
+    key = (user_id, hmac_signature)
+    with _verified_signatures_lock:
+        if key in _verified_signatures:
+            return True
+    if not AuthService.verify_hmac_signature(user_id, hmac_signature):
+        return False
+    with _verified_signatures_lock:
+        _verified_signatures[key] = True
+    return True
+
 
 class ProviderAPI:
     @staticmethod
@@ -53,7 +71,7 @@ class ProviderAPI:
         db: Session = Depends(get_db),
         hmac_signature: str = Header(..., alias="X-HMAC-Signature"),
     ):
-        if not AuthService.verify_hmac_signature(user_id, hmac_signature):
+        if not _verify_hmac_signature(user_id, hmac_signature):
             raise HTTPException(status_code=401, detail="Unauthorized")
         controller = ProviderController(db, user_id)
         return await controller.get_preferred_llm(user_id)
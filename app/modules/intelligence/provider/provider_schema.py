@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class ProviderInfo(BaseModel):
@@ -10,6 +10,17 @@ class ProviderInfo(BaseModel):
 class SetProviderRequest(BaseModel):
     provider: str
 
+    @field_validator("provider")
+    @classmethod
+    def validate_provider(cls, provider: str):
+        # Imported here since provider_service depends on this module
+        from .provider_service import ProviderService
+
+        provider = provider.lower()
+        if provider not in ProviderService.MODEL_CONFIGS:
+            raise ValueError("Invalid provider")
+        return provider
+
 
 class GetProviderResponse(BaseModel):
     preferred_llm: str
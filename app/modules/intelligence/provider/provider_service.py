@@ -1,8 +1,14 @@
+import asyncio
 import logging
 import os
+import threading
+import weakref
 from enum import Enum
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+import httpx
+import litellm
+from cachetools import TTLCache
 from crewai import LLM
 from langchain_anthropic import ChatAnthropic
 from langchain_deepseek import ChatDeepSeek
@@ -15,6 +21,12 @@ from app.modules.utils.posthog_helper import PostHogClient
 
 from .provider_schema import ProviderInfo
 
+# Pooled client for LiteLLM's OpenAI-compatible providers, so CrewAI LLM calls
+# from every agent thread reuse keepalive connections instead of reconnecting
+litellm.client_session = httpx.Client(
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+)
+
 
 class AgentType(Enum):
     CREWAI = "CREWAI"
@@ -82,6 +94,7 @@ class ProviderService:
         )
 
         self.db.commit()
+        invalidate_cached_llms(user_id)
         return {"message": f"AI provider set to {provider}"}
 
     # Model configurations for different providers and sizes
@@ -226,6 +239,10 @@ class ProviderService:
                     }
                 )
 
+            http_async_client = get_http_async_client()
+            if http_async_client and model_class in (ChatOpenAI, ChatDeepSeek):
+                model_params["http_async_client"] = http_async_client
+
             return model_class(**model_params)
 
     def get_large_llm(self, agent_type: AgentType):
@@ -297,3 +314,54 @@ class ProviderService:
             preferred_provider = "openai"
 
         return preferred_provider, model_type
+
+
+# Configured large LLMs shared across requests, keyed on (user_id, agent_type)
+_llm_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+_llm_cache_lock = threading.Lock()
+
+
+def get_cached_llm(db, user_id: str, agent_type: AgentType):
+    """Return the user's large LLM, reusing a recently configured instance."""
+    key = (user_id, agent_type)
+    with _llm_cache_lock:
+        llm = _llm_cache.get(key)
+    if llm is None:
+        llm = ProviderService(db, user_id).get_large_llm(agent_type=agent_type)
+        with _llm_cache_lock:
+            _llm_cache[key] = llm
+    return llm
+
+
+def invalidate_cached_llms(user_id: str):
+    with _llm_cache_lock:
+        for agent_type in AgentType:
+            _llm_cache.pop((user_id, agent_type), None)
+
+
+# Pooled HTTP clients shared by the LangChain models created on each event loop.
+# Connections are bound to the loop that opened them, so FastAPI shares one
+# client per process while each asyncio.run in the Celery workers gets its own.
+_http_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_http_async_client() -> Optional[httpx.AsyncClient]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    client = _http_async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+            timeout=60,
+        )
+        _http_async_clients[loop] = client
+    return client
+
+
+async def close_http_async_client():
+    client = _http_async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
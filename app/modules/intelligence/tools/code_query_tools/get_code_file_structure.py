@@ -42,6 +42,7 @@ class GetCodeFileStructureTool:
 
 
 def get_code_file_structure_tool(db: Session) -> StructuredTool:
+    tool_instance = GetCodeFileStructureTool(db)
     return StructuredTool(
         name="get_code_file_structure",
         description="""Retrieve the hierarchical file structure of a specified repository or subdirectory in a repository. Expecting 'project_id' as a required input and an optional 'path' to specify a subdirectory. If no path is provided, it will assume the root by default.
@@ -53,7 +54,7 @@ def get_code_file_structure_tool(db: Session) -> StructuredTool:
                 filename.extension
         ```
         the path for the subdir_name should be dir_name/subdir_name""",
-        coroutine=GetCodeFileStructureTool(db).arun,
-        func=GetCodeFileStructureTool(db).run,
+        coroutine=tool_instance.arun,
+        func=tool_instance.run,
         args_schema=RepoStructureRequest,
     )
@@ -36,11 +36,7 @@ class GetCodeFromNodeNameTool:
         self.neo4j_driver = self._create_neo4j_driver()
 
     def _create_neo4j_driver(self) -> GraphDatabase.driver:
-        neo4j_config = config_provider.get_neo4j_config()
-        return GraphDatabase.driver(
-            neo4j_config["uri"],
-            auth=(neo4j_config["username"], neo4j_config["password"]),
-        )
+        return config_provider.get_neo4j_driver()
 
     async def arun(self, project_id: str, node_name: str) -> Dict[str, Any]:
         return await asyncio.to_thread(self.run, project_id, node_name)
@@ -137,10 +133,6 @@ class GetCodeFromNodeNameTool:
             logger.warning(f"'projects' not found in file path: {file_path}")
             return file_path
 
-    def __del__(self):
-        if hasattr(self, "neo4j_driver"):
-            self.neo4j_driver.close()
-
 
 def get_code_from_node_name_tool(sql_db: Session, user_id: str) -> Tool:
     tool_instance = GetCodeFromNodeNameTool(sql_db, user_id)
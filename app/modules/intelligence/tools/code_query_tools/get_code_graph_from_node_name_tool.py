@@ -44,12 +44,8 @@ class GetCodeGraphFromNodeNameTool:
         self.neo4j_driver = self._create_neo4j_driver()
 
     def _create_neo4j_driver(self) -> GraphDatabase.driver:
-        """Create and return a Neo4j driver instance."""
-        neo4j_config = config_provider.get_neo4j_config()
-        return GraphDatabase.driver(
-            neo4j_config["uri"],
-            auth=(neo4j_config["username"], neo4j_config["password"]),
-        )
+        """Return the process-wide Neo4j driver."""
+        return config_provider.get_neo4j_driver()
 
     async def arun(self, project_id: str, node_name: str) -> Dict[str, Any]:
         return await asyncio.to_thread(self.run, project_id, node_name)
@@ -204,11 +200,6 @@ class GetCodeGraphFromNodeNameTool:
         except ValueError:
             return file_path
 
-    def __del__(self):
-        """Ensure Neo4j driver is closed when the object is destroyed."""
-        if hasattr(self, "neo4j_driver"):
-            self.neo4j_driver.close()
-
 
 def get_code_graph_from_node_name_tool(sql_db: Session) -> Tool:
     tool_instance = GetCodeGraphFromNodeNameTool(sql_db)
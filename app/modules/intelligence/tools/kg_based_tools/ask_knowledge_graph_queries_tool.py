@@ -123,9 +123,10 @@ class KnowledgeGraphQueryTool:
 
 
 def get_ask_knowledge_graph_queries_tool(sql_db, user_id) -> StructuredTool:
+    tool_instance = KnowledgeGraphQueryTool(sql_db, user_id)
     return StructuredTool.from_function(
-        coroutine=KnowledgeGraphQueryTool(sql_db, user_id).arun,
-        func=KnowledgeGraphQueryTool(sql_db, user_id).run,
+        coroutine=tool_instance.arun,
+        func=tool_instance.run,
         name="Ask Knowledge Graph Queries",
         description="""
     Query the code knowledge graph using multiple natural language questions.
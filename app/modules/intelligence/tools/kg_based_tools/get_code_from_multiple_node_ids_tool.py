@@ -43,11 +43,7 @@ class GetCodeFromMultipleNodeIdsTool:
         self.neo4j_driver = self._create_neo4j_driver()
 
     def _create_neo4j_driver(self) -> GraphDatabase.driver:
-        neo4j_config = config_provider.get_neo4j_config()
-        return GraphDatabase.driver(
-            neo4j_config["uri"],
-            auth=(neo4j_config["username"], neo4j_config["password"]),
-        )
+        return config_provider.get_neo4j_driver()
 
     async def arun(self, project_id: str, node_ids: List[str]) -> Dict[str, Any]:
         return await asyncio.to_thread(self.run, project_id, node_ids)
@@ -149,10 +145,6 @@ class GetCodeFromMultipleNodeIdsTool:
             logger.warning(f"'projects' not found in file path: {file_path}")
             return file_path
 
-    def __del__(self):
-        if hasattr(self, "neo4j_driver"):
-            self.neo4j_driver.close()
-
 
 def get_code_from_multiple_node_ids_tool(sql_db: Session, user_id: str) -> Tool:
     tool_instance = GetCodeFromMultipleNodeIdsTool(sql_db, user_id)
@@ -48,11 +48,7 @@ class GetCodeFromProbableNodeNameTool:
         self.search_service = SearchService(self.sql_db)
 
     def _create_neo4j_driver(self) -> GraphDatabase.driver:
-        neo4j_config = config_provider.get_neo4j_config()
-        return GraphDatabase.driver(
-            neo4j_config["uri"],
-            auth=(neo4j_config["username"], neo4j_config["password"]),
-        )
+        return config_provider.get_neo4j_driver()
 
     async def process_probable_node_name(
         self, project_id: str, probable_node_name: str
@@ -200,10 +196,6 @@ class GetCodeFromProbableNodeNameTool:
             logger.warning(f"'projects' not found in file path: {file_path}")
             return file_path
 
-    def __del__(self):
-        if hasattr(self, "neo4j_driver"):
-            self.neo4j_driver.close()
-
 
 def get_code_from_probable_node_name_tool(sql_db: Session, user_id: str) -> Tool:
     tool_instance = GetCodeFromProbableNodeNameTool(sql_db, user_id)
@@ -2,11 +2,10 @@ import asyncio
 from typing import List
 
 from langchain_core.tools import StructuredTool
+from neo4j import GraphDatabase
 from pydantic import BaseModel, Field
 
-from app.core.config_provider import ConfigProvider
-from app.core.database import get_db
-from app.modules.parsing.graph_construction.code_graph_service import CodeGraphService
+from app.core.config_provider import config_provider
 from app.modules.projects.projects_service import ProjectService
 
 
@@ -45,6 +44,10 @@ class GetNodesFromTags:
     def __init__(self, sql_db, user_id):
         self.sql_db = sql_db
         self.user_id = user_id
+        self.neo4j_driver = self._create_neo4j_driver()
+
+    def _create_neo4j_driver(self) -> GraphDatabase.driver:
+        return config_provider.get_neo4j_driver()
 
     async def arun(self, tags: List[str], project_id: str) -> str:
         return await asyncio.to_thread(self.run, tags, project_id)
@@ -92,20 +95,16 @@ class GetNodesFromTags:
         WHERE ({tag_conditions}) AND n.repoId = '{project_id}'
         RETURN n.file_path AS file_path, n.docstring AS docstring, n.text AS text, n.node_id AS node_id, n.name AS name
         """
-        neo4j_config = ConfigProvider().get_neo4j_config()
-        nodes = CodeGraphService(
-            neo4j_config["uri"],
-            neo4j_config["username"],
-            neo4j_config["password"],
-            next(get_db()),
-        ).query_graph(query)
-        return nodes
+        with self.neo4j_driver.session() as session:
+            result = session.run(query)
+            return [record.data() for record in result]
 
 
 def get_nodes_from_tags_tool(sql_db, user_id) -> StructuredTool:
+    tool_instance = GetNodesFromTags(sql_db, user_id)
     return StructuredTool.from_function(
-        coroutine=GetNodesFromTags(sql_db, user_id).arun,
-        func=GetNodesFromTags(sql_db, user_id).run,
+        coroutine=tool_instance.arun,
+        func=tool_instance.run,
         name="Get Nodes from Tags",
         description="""
         Fetch nodes from the knowledge graph based on specified tags. Use this tool to retrieve nodes of specific types for a project.
@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional
+
+from diskcache import Cache
+from langchain_core.tools import StructuredTool
+
+from app.core.database import SessionLocal
+from app.modules.projects.projects_schema import ProjectStatusEnum
+from app.modules.projects.projects_service import ProjectService
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_DIR = os.path.expanduser("~/.potpie/toolcache")
+TOOL_CACHE_TTL = 7 * 24 * 60 * 60
+
+_disk_cache: Optional[Cache] = None
+
+# Hit/miss totals since process start, keyed by tool name. Tools are called
+# from CrewAI worker threads, so updates go through _stats_lock.
+tool_cache_hits: Counter = Counter()
+tool_cache_misses: Counter = Counter()
+_stats_lock = threading.Lock()
+
+
+def tool_cache_enabled() -> bool:
+    return os.getenv("DISABLE_TOOL_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def _get_disk_cache() -> Cache:
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = Cache(TOOL_CACHE_DIR)
+    return _disk_cache
+
+
+class DiskCachedTool:
+    """Persists the results of a knowledge graph tool across agent runs.
+
+    Results are keyed on the user, project, parsed commit, tool name and
+    arguments, so a reparse at a new commit naturally misses the cache.
+    Projects that are not ready, error responses and calls without a
+    project_id bypass the cache entirely. The commit is looked up with a
+    session of its own, since tools run concurrently in worker threads.
+    """
+
+    def __init__(
+        self,
+        tool: StructuredTool,
+        user_id: str,
+        commit_ids: Optional[Dict[str, Optional[str]]] = None,
+    ):
+        self.tool = tool
+        self.user_id = user_id
+        # Shared between the tools of one agent so each project is looked up once
+        self.commit_ids = commit_ids if commit_ids is not None else {}
+
+    def _get_commit_id(self, project_id: str) -> Optional[str]:
+        if project_id not in self.commit_ids:
+            with SessionLocal() as session:
+                project = ProjectService(session).get_project_from_db_by_id_sync(
+                    project_id
+                )
+            self.commit_ids[project_id] = (
+                project["commit_id"]
+                if project and project["status"] == ProjectStatusEnum.READY.value
+                else None
+            )
+        return self.commit_ids[project_id]
+
+    def _cache_key(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        if not tool_cache_enabled():
+            return None
+        project_id = kwargs.get("project_id")
+        if not project_id:
+            return None
+        commit_id = self._get_commit_id(project_id)
+        if not commit_id:
+            return None
+        payload = json.dumps(
+            [self.user_id, project_id, commit_id, self.tool.name, kwargs],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: Optional[str]):
+        if key is None:
+            return None
+        result = _get_disk_cache().get(key)
+        with _stats_lock:
+            if result is None:
+                tool_cache_misses[self.tool.name] += 1
+            else:
+                tool_cache_hits[self.tool.name] += 1
+        if result is not None:
+            logger.debug(f"Tool cache hit for '{self.tool.name}'")
+        return result
+
+    def _store(self, key: Optional[str], result: Any):
+        if key is None or result is None:
+            return
+        if isinstance(result, dict) and "error" in result:
+            return
+        _get_disk_cache().set(key, result, expire=TOOL_CACHE_TTL)
+
+    def run(self, **kwargs) -> Any:
+        key = self._cache_key(kwargs)
+        result = self._lookup(key)
+        if result is None:
+            result = self.tool.func(**kwargs)
+            self._store(key, result)
+        return result
+
+    async def arun(self, **kwargs) -> Any:
+        # The commit lookup and disk reads block, so keep them off the event loop
+        key = await asyncio.to_thread(self._cache_key, kwargs)
+        result = await asyncio.to_thread(self._lookup, key)
+        if result is None:
+            result = await self.tool.coroutine(**kwargs)
+            await asyncio.to_thread(self._store, key, result)
+        return result
+
+
+def disk_cached_tool(
+    tool: StructuredTool,
+    user_id: str,
+    commit_ids: Optional[Dict[str, Optional[str]]] = None,
+) -> StructuredTool:
+    tool_instance = DiskCachedTool(tool, user_id, commit_ids)
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        coroutine=tool_instance.arun,
+        func=tool_instance.run,
+        args_schema=tool.args_schema,
+    )
+
+
+def log_tool_cache_stats():
+    with _stats_lock:
+        stats = {
+            name: (tool_cache_hits[name], tool_cache_misses[name])
+            for name in sorted(set(tool_cache_hits) | set(tool_cache_misses))
+        }
+    for name, (hits, misses) in stats.items():
+        logger.info(
+            f"Tool cache '{name}' since process start: {hits} hits, {misses} misses"
+        )
+
+
+class ToolMemo:
+    """In-memory LRU of one tool's results, scoped to the agent run that owns it.
+
+    Agents build their tools per request, so the memo only lives for one run
+    and is garbage collected with the agent. A single memo can back several
+    wrappers of the same tool, e.g. ones bound to different DB sessions, so
+    every agent in the run reuses the others' lookups.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kwargs: Dict[str, Any]) -> str:
+        return json.dumps(kwargs, sort_keys=True, default=str)
+
+    def lookup(self, key: str):
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+            return None
+
+    def store(self, key: str, result: Any):
+        if result is None:
+            return
+        if isinstance(result, dict) and "error" in result:
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "maxsize": self.maxsize,
+                "currsize": len(self._results),
+            }
+
+
+class MemoizedTool:
+    """Serves a tool's calls from a ToolMemo before running the tool."""
+
+    def __init__(self, tool: StructuredTool, memo: ToolMemo):
+        self.tool = tool
+        self.memo = memo
+
+    def run(self, **kwargs) -> Any:
+        key = self.memo.key(kwargs)
+        result = self.memo.lookup(key)
+        if result is None:
+            result = self.tool.func(**kwargs)
+            self.memo.store(key, result)
+        return result
+
+    async def arun(self, **kwargs) -> Any:
+        key = self.memo.key(kwargs)
+        result = self.memo.lookup(key)
+        if result is None:
+            result = await self.tool.coroutine(**kwargs)
+            self.memo.store(key, result)
+        return result
+
+
+def memoized_tool(
+    tool: StructuredTool, maxsize: int = 512, memo: Optional[ToolMemo] = None
+) -> StructuredTool:
+    tool_instance = MemoizedTool(tool, memo if memo is not None else ToolMemo(maxsize))
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        coroutine=tool_instance.arun,
+        func=tool_instance.run,
+        args_schema=tool.args_schema,
+    )
+
+
+def log_tool_memo_stats(memos: Dict[str, ToolMemo]):
+    for name, memo in sorted(memos.items()):
+        logger.info(f"Tool memo '{name}': {memo.cache_info()}")
@@ -59,6 +59,15 @@ class SecretManager:
             raise HTTPException(status_code=400, detail="Invalid provider")
         return secret_id
 
+    @staticmethod
+    def invalidate_cached_llms(customer_id: str):
+        # Imported here since provider_service depends on SecretManager
+        from app.modules.intelligence.provider.provider_service import (
+            invalidate_cached_llms,
+        )
+
+        invalidate_cached_llms(customer_id)
+
     @router.post("/secrets")
     def create_secret(
         request: CreateSecretRequest,
@@ -100,6 +109,7 @@ class SecretManager:
             "secret_creation_event",
             {"provider": request.provider, "key_added": "true"},
         )
+        SecretManager.invalidate_cached_llms(customer_id)
 
         return {"message": "Secret created successfully"}
 
@@ -178,6 +188,7 @@ class SecretManager:
             db.add(user_pref)
         user_pref.preferences["provider"] = request.provider
         db.commit()
+        SecretManager.invalidate_cached_llms(customer_id)
 
         return {"message": "Secret updated successfully"}
 
@@ -223,6 +234,7 @@ class SecretManager:
             if user_pref and "provider" in user_pref.preferences:
                 del user_pref.preferences["provider"]
                 db.commit()
+            SecretManager.invalidate_cached_llms(customer_id)
 
             return {
                 "message": "All secrets deletion completed",
@@ -249,6 +261,7 @@ class SecretManager:
                 "secret_deletion_event",
                 {"provider": provider, "key_removed": "true"},
             )
+            SecretManager.invalidate_cached_llms(customer_id)
             return {"message": "Secret deleted successfully"}
         except Exception as e:
             raise HTTPException(status_code=404, detail=f"Secret not found: {str(e)}")